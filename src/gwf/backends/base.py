@@ -1,7 +1,14 @@
+import json
 import logging
+import os
+import os.path
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
 from enum import Enum
 from pkg_resources import iter_entry_points
 
+from ..conf import config
 from ..utils import PersistableDict, retry
 from .exceptions import BackendError, DependencyError, TargetError
 from .logmanager import FileLogManager
@@ -89,6 +96,23 @@ class Backend:
         :func:`submit` directly, unless you want to manually deal with with
         injection of option defaults.
         """
+        self._prepare_options(target)
+        self.submit(target, dependencies)
+
+    def submit_many(self, targets):
+        """Prepare and submit several targets.
+
+        `targets` must be an iterable of `(target, dependencies)` pairs. None
+        of the targets may depend on each other, that is, all dependencies
+        must have been submitted in an earlier call. This allows backends to
+        submit the targets concurrently.
+
+        By default this calls :func:`submit_full` for each target.
+        """
+        for target, dependencies in targets:
+            self.submit_full(target, dependencies)
+
+    def _prepare_options(self, target):
         new_options = dict(self.option_defaults)
         new_options.update(target.options)
 
@@ -104,8 +128,6 @@ class Backend:
                 del new_options[option_name]
         target.options = new_options
 
-        self.submit(target, dependencies)
-
     def submit(self, target, dependencies):
         """Submit `target` with `dependencies`.
 
@@ -128,6 +150,20 @@ class Backend:
             If the target does not exist in the workflow.
         """
 
+    def cancel_many(self, targets):
+        """Cancel all of `targets`.
+
+        By default this calls :func:`cancel` for each target. Backends that
+        can cancel several targets in one go should override this method.
+
+        :param targets:
+            An iterable of :class:`gwf.Target` objects to cancel.
+        :raises gwf.exception.TargetError:
+            If one of the targets does not exist in the workflow.
+        """
+        for target in targets:
+            self.cancel(target)
+
     @classmethod
     def logs(cls, target, stderr=False):
         """Return log files for a target.
@@ -167,18 +203,39 @@ class PbsLikeBackendBase(Backend):
     option_defaults = {}
     log_manager = FileLogManager()
 
-    def __init__(self):
-        try:
-            self._status = self.parse_queue_output(self.call_queue_command())
-        except retry.RetryError as exc:
-            raise BackendError("Could not get queue state") from exc
+    #: Maximum number of submit commands running at the same time.
+    max_submit_workers = 16
 
+    def __init__(self):
         class_name = self.__class__.__name__
         backend_name = class_name.strip("Backend").lower()
 
+        self._status_ttl = config.get(
+            "backend.{name}.status_ttl".format(name=backend_name), 0
+        )
+        self._status_cache_path = ".gwf/{name}-backend-status.json".format(
+            name=backend_name
+        )
+        self._queue_status = None
+
         path = ".gwf/{name}-backend-tracked.json".format(name=backend_name)
         self._tracked = PersistableDict(path=path)
 
+    @property
+    def _status(self):
+        """Status of the jobs in the queue, keyed by job id.
+
+        The queue is only queried the first time the status is needed, since
+        not all operations need it.
+        """
+        self._ensure_status_loaded()
+        return self._queue_status
+
+    def _ensure_status_loaded(self):
+        """Load the queue status now unless it has already been loaded."""
+        if self._queue_status is None:
+            self._queue_status = self._load_status()
+
     def parse_queue_output(self):
         raise NotImplementedError("parse_queue_output")
 
@@ -203,6 +260,11 @@ class PbsLikeBackendBase(Backend):
     def submit(self, target, dependencies):
         script = self.compile_script(target)
         dependency_ids = self._collect_dependency_ids(dependencies)
+
+        # Make sure the queue status is loaded before submitting, so that we
+        # can't fail to track the job after it has been submitted.
+        self._ensure_status_loaded()
+
         try:
             stdout = self.call_submit_command(script, dependency_ids)
         except retry.RetryError as exc:
@@ -210,17 +272,106 @@ class PbsLikeBackendBase(Backend):
         else:
             job_id = stdout.strip()
             self._add_job(target, job_id)
+            self._update_status_cache()
+
+    def submit_many(self, targets):
+        pending = []
+        for target, dependencies in targets:
+            self._prepare_options(target)
+            script = self.compile_script(target)
+            dependency_ids = self._collect_dependency_ids(dependencies)
+            pending.append((target, script, dependency_ids))
+        if not pending:
+            return
+
+        # Make sure the queue status is loaded before submitting, so that we
+        # can't fail to track the jobs after they have been submitted.
+        self._ensure_status_loaded()
+
+        # The submit commands spend most of their time waiting for the
+        # scheduler, so running them in threads lets them overlap.
+        with ThreadPoolExecutor(max_workers=self.max_submit_workers) as executor:
+            futures = [
+                executor.submit(self.call_submit_command, script, dependency_ids)
+                for _, script, dependency_ids in pending
+            ]
+
+        # Record the job id of every job that was submitted before doing
+        # anything else that could fail, so that we don't lose track of jobs
+        # that are already in the queue.
+        submitted = []
+        failed = None
+        for (target, _, _), future in zip(pending, futures):
+            try:
+                stdout = future.result()
+            except Exception as exc:
+                if failed is None:
+                    failed = exc
+            else:
+                self._set_job_id(target, stdout.strip())
+                submitted.append(target)
+
+        for target in submitted:
+            self._set_status(target, Status.SUBMITTED)
+        self._update_status_cache()
+
+        if isinstance(failed, retry.RetryError):
+            raise BackendError("Could not submit target") from failed
+        elif failed is not None:
+            raise failed
 
     def cancel(self, target):
+        self.cancel_many([target])
+
+    def cancel_many(self, targets):
+        targets = list(targets)
         try:
-            job_id = self.get_job_id(target)
-            self.call_cancel_command(job_id)
+            job_ids = [self.get_job_id(target) for target in targets]
         except KeyError as exc:
-            raise TargetError(target.name) from exc
-        except retry.RetryError as exc:
-            raise BackendError("Could not cancel target") from exc
+            raise TargetError(exc.args[0]) from exc
+        if not job_ids:
+            return
+
+        # A single job id that the scheduler doesn't know (e.g. because the job
+        # just finished) makes the whole command fail, and some of the jobs may
+        # have been cancelled anyway. Retrying won't help with that, so the
+        # batched command is only tried once before we fall back.
+        try:
+            self.call_cancel_command(*job_ids)
+        except BackendError:
+            logger.debug("Cancelling jobs together failed, cancelling one by one")
+            self._cancel_each(targets)
         else:
+            for target in targets:
+                self.forget_job(target)
+            self._update_status_cache()
+
+    def _cancel_each(self, targets):
+        """Cancel `targets` one at a time.
+
+        The queue is queried again first and targets whose job is no longer
+        in the queue are forgotten without being cancelled.
+        """
+        self._queue_status = self._query_queue()
+
+        failed = None
+        for target in targets:
+            job_id = self.get_job_id(target)
+            if self._queue_status.get(job_id, Status.UNKNOWN) != Status.UNKNOWN:
+                try:
+                    self._cancel_job(job_id)
+                except retry.RetryError as exc:
+                    failed = exc
+                    continue
             self.forget_job(target)
+        self._update_status_cache()
+
+        if failed is not None:
+            raise BackendError("Could not cancel target") from failed
+
+    @retry(on_exc=BackendError)
+    def _cancel_job(self, job_id):
+        return self.call_cancel_command(job_id)
 
     def close(self):
         self._tracked.persist()
@@ -228,7 +379,8 @@ class PbsLikeBackendBase(Backend):
     def forget_job(self, target):
         """Force the backend to forget the job associated with `target`."""
         job_id = self.get_job_id(target)
-        del self._status[job_id]
+        if self._queue_status is not None:
+            self._queue_status.pop(job_id, None)
         del self._tracked[target.name]
 
     def get_job_id(self, target):
@@ -253,8 +405,63 @@ class PbsLikeBackendBase(Backend):
         job_id = self.get_job_id(target)
         self._status[job_id] = status
 
+    def _load_status(self):
+        status = self._read_status_cache()
+        if status is None:
+            status = self._query_queue()
+            self._write_status_cache(status)
+        return status
+
+    def _query_queue(self):
+        try:
+            return self.parse_queue_output(self.call_queue_command())
+        except retry.RetryError as exc:
+            raise BackendError("Could not get queue state") from exc
+
+    def _read_status_cache(self):
+        """Return the cached queue status or `None` if it is missing or expired."""
+        if self._status_ttl <= 0:
+            return None
+        try:
+            age = time.time() - os.path.getmtime(self._status_cache_path)
+            if age > self._status_ttl:
+                return None
+            with open(self._status_cache_path) as fileobj:
+                data = json.load(fileobj)
+            status = {job_id: Status(value) for job_id, value in data.items()}
+        except (OSError, ValueError, AttributeError, TypeError):
+            return None
+        logger.debug("Using queue status cached %.1f seconds ago", age)
+        return status
+
+    def _write_status_cache(self, status):
+        if self._status_ttl <= 0:
+            return
+        data = {job_id: job_status.value for job_id, job_status in status.items()}
+        with suppress(OSError):
+            with open(self._status_cache_path + ".new", "w") as fileobj:
+                json.dump(data, fileobj)
+            os.rename(self._status_cache_path + ".new", self._status_cache_path)
+
+    def _update_status_cache(self):
+        """Write local changes to the queue status back to the cache.
+
+        The modification time of the cache is kept, so that the status is not
+        trusted for longer than `status_ttl` seconds after the queue was
+        actually queried.
+        """
+        if self._status_ttl <= 0 or self._queue_status is None:
+            return
+        with suppress(OSError):
+            mtime = os.path.getmtime(self._status_cache_path)
+            self._write_status_cache(self._status)
+            os.utime(self._status_cache_path, (mtime, mtime))
+
     def _collect_dependency_ids(self, dependencies):
+        # Index the underlying dict directly to avoid going through
+        # UserDict.__getitem__ for every dependency.
+        tracked = self._tracked.data
         try:
-            return [self._tracked[dep.name] for dep in dependencies]
+            return [tracked[dep.name] for dep in dependencies]
         except KeyError as exc:
             raise DependencyError(exc.args[0])
@@ -1,5 +1,6 @@
+import io
 import logging
-import re
+import string
 from xml.etree import ElementTree
 
 from ..utils import ensure_trailing_newline, retry
@@ -10,6 +11,31 @@ from .utils import call
 logger = logging.getLogger(__name__)
 
 
+def _classify_state(state):
+    """Return the status of a job given its SGE state string."""
+    # Guessing job state based on
+    # https://gist.github.com/cmaureir/4fa2d34bc9a1bd194af1
+    if "d" in state or "E" in state:
+        return Status.UNKNOWN
+    elif "r" in state or "t" in state or "s" in state:
+        return Status.RUNNING
+    return Status.SUBMITTED
+
+
+def _iter_job_states(stdout):
+    # Stream through the document instead of building the full tree, since
+    # qstat output can be very large on busy clusters. Each job element is
+    # cleared once we've read it, which frees its children. The emptied job
+    # elements stay attached to their parent, so memory use still grows with
+    # the number of jobs, but much more slowly.
+    events = ElementTree.iterparse(io.BytesIO(stdout), events=("end",))
+    for _, job in events:
+        if job.tag != "job_list":
+            continue
+        yield job.findtext("JB_job_number"), _classify_state(job.findtext("state"))
+        job.clear()
+
+
 class SGEBackend(PbsLikeBackendBase):
     """Backend for Sun Grid Engine (SGE).
 
@@ -20,7 +46,10 @@ class SGEBackend(PbsLikeBackendBase):
 
     **Backend options:**
 
-    None.
+    * **backend.sge.status_ttl (int):** Number of seconds for which the queue
+      status obtained from :command:`qstat` is cached between invocations of
+      *gwf*. Targets submitted or cancelled in the meantime are updated in
+      the cache. If `0`, the queue status is never cached (default: `0`).
 
     **Target options:**
 
@@ -54,16 +83,15 @@ class SGEBackend(PbsLikeBackendBase):
         "account": "-P ",
     }
 
+    option_str = "#$ {0}{1}"
+
     @retry(on_exc=BackendError)
     def call_queue_command(self,):
-        return call("qstat", "-f", "-xml")
+        return call("qstat", "-f", "-xml", text=False)
 
-    @retry(on_exc=BackendError)
-    def call_cancel_command(self, job_id):
-        # The --verbose flag here is necessary, otherwise we're not able to tell
-        # whether the command failed. See the comment in call() if you
-        # want to know more.
-        return call("qdel", job_id)
+    def call_cancel_command(self, *job_ids):
+        # Not retried here, PbsLikeBackendBase decides when to retry.
+        return call("qdel", *job_ids)
 
     @retry(on_exc=BackendError)
     def call_submit_command(self, script, dependencies):
@@ -74,31 +102,18 @@ class SGEBackend(PbsLikeBackendBase):
         return call("qsub", *args, input=script)
 
     def parse_queue_output(self, stdout):
-        job_states = {}
-        root = ElementTree.fromstring(stdout)
-        for job in root.iter("job_list"):
-            job_id = job.find("JB_job_number").text
-            state = job.find("state").text
-
-            # Guessing job state based on
-            # https://gist.github.com/cmaureir/4fa2d34bc9a1bd194af1
-            if "d" in state or "E" in state:
-                job_state = Status.UNKNOWN
-            elif "r" in state or "t" in state or "s" in state:
-                job_state = Status.RUNNING
-            else:
-                job_state = Status.SUBMITTED
-            job_states[job_id] = job_state
-        return job_states
+        # An idle queue produces a document without any jobs, so don't bother
+        # parsing it.
+        if b"<job_list" not in stdout:
+            return {}
+        return dict(_iter_job_states(stdout))
 
     def compile_script(self, target):
-        option_str = "#$ {0}{1}"
-
         out = []
         out.append("#!/bin/bash")
         out.append("# Generated by: gwf")
 
-        out.append(option_str.format("-N ", target.name))
+        out.append(self.option_str.format("-N ", target.name))
         out.append("#$ -V")
         out.append("#$ -w v")
         out.append("#$ -cwd")
@@ -106,14 +121,16 @@ class SGEBackend(PbsLikeBackendBase):
         for option_name, option_value in target.options.items():
             # SGE wants per-core memory, but gwf wants total memory.
             if option_name == "memory":
-                number = int(re.sub(r"[^0-9]+", "", option_value))
-                unit = re.sub(r"[0-9]+", "", option_value)
+                unit = option_value.lstrip(string.digits)
+                number = int(option_value[: len(option_value) - len(unit)])
                 cores = target.options["cores"]
                 option_value = "{}{}".format(number // cores, unit)
-            out.append(option_str.format(self.option_flags[option_name], option_value))
+            out.append(
+                self.option_str.format(self.option_flags[option_name], option_value)
+            )
 
-        out.append(option_str.format("-o ", self.log_manager.stdout_path(target)))
-        out.append(option_str.format("-e ", self.log_manager.stderr_path(target)))
+        out.append(self.option_str.format("-o ", self.log_manager.stdout_path(target)))
+        out.append(self.option_str.format("-e ", self.log_manager.stderr_path(target)))
 
         out.append("")
         out.append("cd {}".format(target.working_dir))
@@ -22,6 +22,8 @@ SLURM_JOB_STATES = defaultdict(
     },
 )
 
+SLURM_ALREADY_COMPLETING = "already completing or completed"
+
 
 class SlurmBackend(PbsLikeBackendBase):
     """Backend for the Slurm workload manager.
@@ -35,6 +37,11 @@ class SlurmBackend(PbsLikeBackendBase):
       standard output and one for standard error. If `merged`, only one log
       file will be written containing the combined streams. If `none`, no logs
       will be stored. (default: `full`).
+    * **backend.slurm.status_ttl (int):** Number of seconds for which the
+      queue status obtained from :command:`squeue` is cached between
+      invocations of *gwf*. Targets submitted or cancelled in the meantime
+      are updated in the cache. If `0`, the queue status is never cached
+      (default: `0`).
 
     **Target options:**
 
@@ -99,12 +106,22 @@ class SlurmBackend(PbsLikeBackendBase):
     def call_queue_command(self):
         return call("squeue", "--noheader", "--format=%i;%t", "--all")
 
-    @retry(on_exc=BackendError)
-    def call_cancel_command(self, job_id):
+    def call_cancel_command(self, *job_ids):
+        # Not retried here, PbsLikeBackendBase decides when to retry.
+        #
         # The --verbose flag here is necessary, otherwise we're not able to tell
         # whether the command failed. See the comment in call() if you
         # want to know more.
-        return call("scancel", "--verbose", job_id)
+        try:
+            return call("scancel", "--verbose", *job_ids)
+        except BackendError as exc:
+            # Jobs that were just cancelled linger in the completing state, and
+            # cancelling them again fails. Since they're on their way out of
+            # the queue anyway, that's not an error for us.
+            errors = [line for line in str(exc).splitlines() if "error:" in line]
+            if errors and all(SLURM_ALREADY_COMPLETING in line for line in errors):
+                return ""
+            raise
 
     @retry(on_exc=BackendError)
     def call_submit_command(self, script, dependencies):
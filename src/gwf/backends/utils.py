@@ -1,11 +1,13 @@
+import functools
+import shutil
 import subprocess
-from distutils.spawn import find_executable
 
 from .exceptions import BackendError
 
 
+@functools.lru_cache(maxsize=None)
 def _find_exe(name):
-    exe = find_executable(name)
+    exe = shutil.which(name)
     if exe is None:
         raise BackendError(
             'Could not find executable "{}". This backend requires Slurm to be installed on this host.'.format(
@@ -15,16 +17,25 @@ def _find_exe(name):
     return exe
 
 
-def call(executable_name, *args, input=None):
+def call(executable_name, *args, input=None, text=True):
+    """Call an executable and return its standard output.
+
+    If `text` is false, standard output is returned as bytes instead of being
+    decoded, which avoids a round-trip for callers that parse bytes anyway.
+    """
     executable_path = _find_exe(executable_name)
-    proc = subprocess.Popen(
-        [executable_path] + list(args),
+
+    # Python < 3.7 refuses the stdin argument together with input, even if
+    # stdin is None, so only pass it when there is no input.
+    kwargs = {"input": input} if input is not None else {"stdin": subprocess.DEVNULL}
+    proc = subprocess.run(
+        (executable_path,) + args,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
-        stdin=subprocess.PIPE,
-        universal_newlines=True,
+        universal_newlines=text,
+        **kwargs
     )
-    stdout, stderr = proc.communicate(input)
+    stderr = proc.stderr if text else proc.stderr.decode(errors="replace")
 
     # Some commands, like scancel, do not return a non-zero exit code if they
     # fail. The only way to check if they failed is by checking whether an
@@ -32,4 +43,4 @@ def call(executable_name, *args, input=None):
     # code and stderr.
     if proc.returncode != 0 or "error:" in stderr:
         raise BackendError(stderr)
-    return stdout
+    return proc.stdout
@@ -8,14 +8,17 @@ from ..workflow import Workflow
 
 
 def cancel_many(backend, targets):
+    to_cancel = []
     for target in targets:
-        try:
-            click.echo("Cancelling target {}".format(target.name), err=True)
-            if backend.status(target) != Status.UNKNOWN:
-                backend.cancel(target)
-        except UnsupportedOperationError:
-            click.echo("Cancelling targets is not supported by this backend", err=True)
-            raise click.Abort()
+        click.echo("Cancelling target {}".format(target.name), err=True)
+        if backend.status(target) != Status.UNKNOWN:
+            to_cancel.append(target)
+
+    try:
+        backend.cancel_many(to_cancel)
+    except UnsupportedOperationError:
+        click.echo("Cancelling targets is not supported by this backend", err=True)
+        raise click.Abort()
 
 
 @click.command()
@@ -24,7 +24,28 @@ def clean_logs(graph, backend):
             backend.log_manager.remove_stderr(target_name)
 
 
+def submission_waves(targets, scheduled):
+    """Group `targets` into waves that can be submitted one after another.
+
+    All dependencies of a target in a wave are either in an earlier wave or
+    not in `targets` at all, so the targets in a wave can be submitted
+    together. `targets` must be ordered such that dependencies come first.
+    """
+    levels = {}
+    waves = []
+    for target in targets:
+        level = 1 + max(
+            (levels[dep] for dep in scheduled[target] if dep in levels), default=-1
+        )
+        levels[target] = level
+        if level == len(waves):
+            waves.append([])
+        waves[level].append(target)
+    return waves
+
+
 def submit(graph, scheduled, reasons, backend, dry_run):
+    to_submit = []
     seen = set()
     for endpoint in graph.endpoints():
         for target in graph.dfs(endpoint):
@@ -44,8 +65,13 @@ def submit(graph, scheduled, reasons, backend, dry_run):
             if dry_run:
                 logger.info("Would submit target %s", target.name)
             else:
-                logger.info("Submitting target %s", target.name)
-                backend.submit_full(target, dependencies=scheduled[target])
+                to_submit.append(target)
+
+    for wave in submission_waves(to_submit, scheduled):
+        logger.debug("Submitting %d target(s)", len(wave))
+        backend.submit_many((target, scheduled[target]) for target in wave)
+        for target in wave:
+            logger.info("Submitted target %s", target.name)
 
 
 @click.command()
@@ -19,6 +19,11 @@ import click
 
 from gwf.exceptions import GWFError
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 UPDATE_CHECK_URL = "https://pypi.org/pypi/gwf/json"
 UPDATE_CHECK_FILE = ".gwf/update"
 UPDATE_CHECK_WAIT = 24 * 60 * 60
@@ -108,8 +113,12 @@ class PersistableDict(UserDict):
 
         self.path = path
         try:
-            with open(self.path) as fileobj:
-                self.data.update(json.load(fileobj))
+            with open(self.path, "rb") as fileobj:
+                content = fileobj.read()
+            if orjson is not None:
+                self.data.update(orjson.loads(content))
+            else:
+                self.data.update(json.loads(content.decode()))
         except (OSError, ValueError):
             # Catch ValueError for compatibility with Python 3.4.2. I haven't been
             # able to figure out what is different between 3.4.2 and 3.5 that
@@ -120,8 +129,13 @@ class PersistableDict(UserDict):
             pass
 
     def persist(self):
-        with open(self.path + ".new", "w") as fileobj:
-            json.dump(self.data, fileobj)
+        if orjson is not None:
+            content = orjson.dumps(self.data)
+        else:
+            content = json.dumps(self.data).encode()
+
+        with open(self.path + ".new", "wb") as fileobj:
+            fileobj.write(content)
             fileobj.flush()
             os.fsync(fileobj.fileno())
             fileobj.close()
@@ -0,0 +1,345 @@
+import os.path
+from unittest.mock import patch
+
+import pytest
+
+from gwf import Target
+from gwf.backends.base import Status
+from gwf.backends.exceptions import BackendError, DependencyError
+from gwf.backends.sge import SGEBackend
+from gwf.conf import config
+
+QSTAT_OUTPUT = b"""<?xml version='1.0'?>
+<job_info  xmlns:xsd="http://arc.liv.ac.uk/repos/darcs/sge/source/dist/util/resources/schemas/qstat/qstat.xsd">
+  <queue_info>
+    <Queue-List>
+      <name>all.q@node1</name>
+      <qtype>BIP</qtype>
+      <job_list state="running">
+        <JB_job_number>1</JB_job_number>
+        <JAT_prio>0.55500</JAT_prio>
+        <JB_name>Target1</JB_name>
+        <JB_owner>user</JB_owner>
+        <state>r</state>
+        <slots>1</slots>
+      </job_list>
+      <job_list state="running">
+        <JB_job_number>2</JB_job_number>
+        <JB_name>Target2</JB_name>
+        <state>dr</state>
+      </job_list>
+    </Queue-List>
+  </queue_info>
+  <job_info>
+    <job_list state="pending">
+      <JB_job_number>3</JB_job_number>
+      <JB_name>Target3</JB_name>
+      <state>qw</state>
+    </job_list>
+    <job_list state="pending">
+      <JB_job_number>4</JB_job_number>
+      <JB_name>Target4</JB_name>
+      <state>Eqw</state>
+    </job_list>
+  </job_info>
+</job_info>
+"""
+
+EMPTY_QSTAT_OUTPUT = b"""<?xml version='1.0'?>
+<job_info  xmlns:xsd="http://arc.liv.ac.uk/repos/darcs/sge/source/dist/util/resources/schemas/qstat/qstat.xsd">
+  <queue_info>
+  </queue_info>
+  <job_info>
+  </job_info>
+</job_info>
+"""
+
+
+@pytest.fixture
+def sge_backend(tmpdir, monkeypatch):
+    monkeypatch.chdir(tmpdir)
+    tmpdir.mkdir(".gwf")
+    with patch.object(SGEBackend, "call_queue_command", return_value=QSTAT_OUTPUT):
+        yield SGEBackend()
+
+
+def test_parse_queue_output(sge_backend):
+    assert sge_backend.parse_queue_output(QSTAT_OUTPUT) == {
+        "1": Status.RUNNING,
+        "2": Status.UNKNOWN,
+        "3": Status.SUBMITTED,
+        "4": Status.UNKNOWN,
+    }
+
+
+def test_parse_queue_output_with_no_jobs(sge_backend):
+    assert sge_backend.parse_queue_output(EMPTY_QSTAT_OUTPUT) == {}
+
+
+@pytest.fixture
+def status_ttl(monkeypatch):
+    monkeypatch.setitem(config, "backend.sge.status_ttl", 60)
+
+
+def test_queue_status_is_only_queried_when_needed(sge_backend):
+    target = Target(
+        "TestTarget", inputs=[], outputs=[], options={}, working_dir="/some/dir"
+    )
+
+    with patch.object(SGEBackend, "call_queue_command") as mock_call:
+        backend = SGEBackend()
+        assert backend.status(target) == Status.UNKNOWN
+        assert not mock_call.called
+
+
+def test_queue_status_is_not_cached_by_default(sge_backend):
+    sge_backend._ensure_status_loaded()
+    assert not os.path.exists(".gwf/sge-backend-status.json")
+
+
+def test_queue_status_is_read_from_cache_within_ttl(tmpdir, monkeypatch, status_ttl):
+    monkeypatch.chdir(tmpdir)
+    tmpdir.mkdir(".gwf")
+
+    with patch.object(SGEBackend, "call_queue_command", return_value=QSTAT_OUTPUT):
+        SGEBackend()._ensure_status_loaded()
+
+    with patch.object(SGEBackend, "call_queue_command") as mock_call:
+        backend = SGEBackend()
+        assert backend._status["1"] == Status.RUNNING
+        assert not mock_call.called
+
+
+def test_queue_status_cache_is_updated_on_submit(tmpdir, monkeypatch, status_ttl):
+    monkeypatch.chdir(tmpdir)
+    tmpdir.mkdir(".gwf")
+
+    target = Target(
+        "TestTarget", inputs=[], outputs=[], options={}, working_dir="/some/dir"
+    )
+
+    with patch.object(SGEBackend, "call_queue_command", return_value=QSTAT_OUTPUT):
+        backend = SGEBackend()
+        backend._ensure_status_loaded()
+    assert os.path.exists(".gwf/sge-backend-status.json")
+
+    mtime = os.path.getmtime(".gwf/sge-backend-status.json")
+
+    with patch.object(SGEBackend, "call_submit_command", return_value="5\n"):
+        backend.submit_full(target, set())
+    assert os.path.getmtime(".gwf/sge-backend-status.json") == mtime
+
+    with patch.object(SGEBackend, "call_queue_command") as mock_call:
+        backend = SGEBackend()
+        assert backend._status["5"] == Status.SUBMITTED
+        assert not mock_call.called
+
+
+def test_cancel_many_calls_qdel_once(sge_backend):
+    target1 = Target(
+        "TestTarget1", inputs=[], outputs=[], options={}, working_dir="/some/dir"
+    )
+    target2 = Target(
+        "TestTarget2", inputs=[], outputs=[], options={}, working_dir="/some/dir"
+    )
+    sge_backend._add_job(target1, "1")
+    sge_backend._add_job(target2, "3")
+
+    with patch("gwf.backends.sge.call") as mock_call:
+        sge_backend.cancel_many([target1, target2])
+
+    mock_call.assert_called_once_with("qdel", "1", "3")
+    assert sge_backend.status(target1) == Status.UNKNOWN
+    assert sge_backend.status(target2) == Status.UNKNOWN
+
+
+def test_submit_many_tracks_all_submitted_targets(sge_backend):
+    target1 = Target(
+        "TestTarget1", inputs=[], outputs=[], options={}, working_dir="/some/dir"
+    )
+    target2 = Target(
+        "TestTarget2", inputs=[], outputs=[], options={}, working_dir="/some/dir"
+    )
+
+    job_ids = {"TestTarget1": "10\n", "TestTarget2": "11\n"}
+
+    def fake_submit(script, dependencies):
+        name = script.split("#$ -N ")[1].split("\n")[0]
+        return job_ids[name]
+
+    with patch.object(sge_backend, "call_submit_command", side_effect=fake_submit):
+        sge_backend.submit_many([(target1, set()), (target2, set())])
+
+    assert sge_backend.get_job_id(target1) == "10"
+    assert sge_backend.get_job_id(target2) == "11"
+    assert sge_backend.status(target1) == Status.SUBMITTED
+    assert sge_backend.status(target2) == Status.SUBMITTED
+
+
+def test_compile_script_divides_memory_by_cores(sge_backend):
+    target = Target(
+        "TestTarget",
+        inputs=[],
+        outputs=[],
+        options={"cores": 4, "memory": "16g"},
+        working_dir="/some/dir",
+    )
+
+    script = sge_backend.compile_script(target)
+    lines = script.splitlines()
+    assert "#$ -N TestTarget" in lines
+    assert "#$ -pe smp 4" in lines
+    assert "#$ -l h_vmem=4g" in lines
+    assert "cd /some/dir" in lines
+
+
+def test_submit_passes_dependency_job_ids(sge_backend):
+    target1 = Target(
+        "TestTarget1", inputs=[], outputs=[], options={}, working_dir="/some/dir"
+    )
+    target2 = Target(
+        "TestTarget2", inputs=[], outputs=[], options={}, working_dir="/some/dir"
+    )
+    target3 = Target(
+        "TestTarget3", inputs=[], outputs=[], options={}, working_dir="/some/dir"
+    )
+    sge_backend._add_job(target1, "1")
+
+    with patch.object(
+        sge_backend, "call_submit_command", return_value="2\n"
+    ) as mock_call:
+        sge_backend.submit_full(target2, [target1])
+    assert mock_call.call_args[0][1] == ["1"]
+
+    with pytest.raises(DependencyError):
+        sge_backend.submit_full(target3, [target1, Target.empty("Missing")])
+
+
+def test_submit_many_does_not_submit_if_queue_status_is_unavailable(
+    tmpdir, monkeypatch, no_sleep
+):
+    monkeypatch.chdir(tmpdir)
+    tmpdir.mkdir(".gwf")
+
+    targets = [
+        Target(
+            "TestTarget{}".format(i),
+            inputs=[],
+            outputs=[],
+            options={},
+            working_dir="/some/dir",
+        )
+        for i in range(3)
+    ]
+
+    backend = SGEBackend()
+    with patch("gwf.backends.sge.call", side_effect=BackendError("error:")):
+        with patch.object(
+            backend, "call_submit_command", return_value="10\n"
+        ) as mock_submit:
+            with pytest.raises(BackendError):
+                backend.submit_many([(target, set()) for target in targets])
+
+    assert not mock_submit.called
+    assert backend._tracked == {}
+
+
+def test_submit_many_tracks_submitted_targets_when_some_fail(sge_backend, no_sleep):
+    target1 = Target(
+        "TestTarget1", inputs=[], outputs=[], options={}, working_dir="/some/dir"
+    )
+    target2 = Target(
+        "TestTarget2", inputs=[], outputs=[], options={}, working_dir="/some/dir"
+    )
+    target3 = Target(
+        "TestTarget3", inputs=[], outputs=[], options={}, working_dir="/some/dir"
+    )
+
+    def fake_call(executable_name, *args, input=None):
+        if "#$ -N TestTarget2" in input:
+            raise BackendError("error: submission failed")
+        return "10\n" if "#$ -N TestTarget1" in input else "12\n"
+
+    with patch("gwf.backends.sge.call", side_effect=fake_call):
+        with pytest.raises(BackendError):
+            sge_backend.submit_many(
+                [(target1, set()), (target2, set()), (target3, set())]
+            )
+
+    assert sge_backend._tracked == {"TestTarget1": "10", "TestTarget3": "12"}
+    assert sge_backend.status(target1) == Status.SUBMITTED
+    assert sge_backend.status(target2) == Status.UNKNOWN
+    assert sge_backend.status(target3) == Status.SUBMITTED
+
+
+def test_cancel_many_falls_back_to_cancelling_one_by_one(sge_backend, no_sleep):
+    target1 = Target(
+        "TestTarget1", inputs=[], outputs=[], options={}, working_dir="/some/dir"
+    )
+    target2 = Target(
+        "TestTarget2", inputs=[], outputs=[], options={}, working_dir="/some/dir"
+    )
+    target3 = Target(
+        "TestTarget3", inputs=[], outputs=[], options={}, working_dir="/some/dir"
+    )
+    sge_backend._add_job(target1, "1")
+    sge_backend._add_job(target2, "3")
+    sge_backend._add_job(target3, "99")
+
+    # Job 99 is no longer known to SGE, so cancelling all jobs at once fails.
+    # Job 3 can't be cancelled either.
+    def fake_call(executable_name, *args, input=None, text=True):
+        if executable_name == "qstat":
+            return QSTAT_OUTPUT
+        if "99" in args or "3" in args:
+            raise BackendError("error: could not delete job")
+        return ""
+
+    with patch("gwf.backends.sge.call", side_effect=fake_call) as mock_call:
+        with pytest.raises(BackendError):
+            sge_backend.cancel_many([target1, target2, target3])
+
+    qdel_calls = [call[0] for call in mock_call.call_args_list if call[0][0] == "qdel"]
+    assert qdel_calls.count(("qdel", "1", "3", "99")) == 1
+    assert ("qdel", "99") not in qdel_calls
+    assert sge_backend._tracked == {"TestTarget2": "3"}
+    assert sge_backend.status(target1) == Status.UNKNOWN
+    assert sge_backend.status(target2) == Status.SUBMITTED
+
+
+def test_submit_many_tracks_submitted_targets_on_unexpected_errors(
+    sge_backend, no_sleep
+):
+    target1 = Target(
+        "TestTarget1", inputs=[], outputs=[], options={}, working_dir="/some/dir"
+    )
+    target2 = Target(
+        "TestTarget2", inputs=[], outputs=[], options={}, working_dir="/some/dir"
+    )
+
+    def fake_call(executable_name, *args, input=None):
+        if "#$ -N TestTarget1" in input:
+            raise OSError("could not start qsub")
+        return "11\n"
+
+    with patch("gwf.backends.sge.call", side_effect=fake_call):
+        with pytest.raises(OSError):
+            sge_backend.submit_many([(target1, set()), (target2, set())])
+
+    assert sge_backend._tracked == {"TestTarget2": "11"}
+    assert sge_backend.status(target2) == Status.SUBMITTED
+
+
+@pytest.mark.parametrize("content", ["[1, 2]", '{"1": 42}', "not json"])
+def test_corrupt_queue_status_cache_is_ignored(
+    tmpdir, monkeypatch, status_ttl, content
+):
+    monkeypatch.chdir(tmpdir)
+    tmpdir.mkdir(".gwf").join("sge-backend-status.json").write(content)
+
+    with patch.object(
+        SGEBackend, "call_queue_command", return_value=QSTAT_OUTPUT
+    ) as mock_call:
+        backend = SGEBackend()
+        assert backend._status["1"] == Status.RUNNING
+        assert mock_call.called
@@ -0,0 +1,35 @@
+from unittest.mock import patch
+
+import pytest
+
+from gwf.backends.exceptions import BackendError
+from gwf.backends.slurm import SlurmBackend
+
+ALREADY_COMPLETING = (
+    "scancel: Terminating job 1\n"
+    "scancel: error: Kill job error on job id 1: "
+    "Job/step already completing or completed\n"
+)
+
+INVALID_JOB_ID = (
+    "scancel: Terminating job 1\n"
+    "scancel: error: Kill job error on job id 2: Invalid job id specified\n"
+)
+
+
+@pytest.fixture
+def slurm_backend(tmpdir, monkeypatch):
+    monkeypatch.chdir(tmpdir)
+    tmpdir.mkdir(".gwf")
+    return SlurmBackend()
+
+
+def test_cancel_command_ignores_jobs_already_completing(slurm_backend):
+    with patch("gwf.backends.slurm.call", side_effect=BackendError(ALREADY_COMPLETING)):
+        assert slurm_backend.call_cancel_command("1") == ""
+
+
+def test_cancel_command_fails_on_other_errors(slurm_backend):
+    with patch("gwf.backends.slurm.call", side_effect=BackendError(INVALID_JOB_ID)):
+        with pytest.raises(BackendError):
+            slurm_backend.call_cancel_command("1", "2")
@@ -0,0 +1,24 @@
+import subprocess
+from unittest.mock import patch
+
+from gwf.backends.utils import call
+
+
+def test_call_passes_input_to_command():
+    assert call("cat", input="hello world") == "hello world"
+
+
+def test_call_does_not_pass_stdin_together_with_input():
+    with patch("gwf.backends.utils.subprocess.run", wraps=subprocess.run) as mock_run:
+        call("cat", input="hello world")
+    _, kwargs = mock_run.call_args
+    assert "stdin" not in kwargs
+    assert kwargs["input"] == "hello world"
+
+
+def test_call_reads_stdin_from_devnull_without_input():
+    with patch("gwf.backends.utils.subprocess.run", wraps=subprocess.run) as mock_run:
+        assert call("cat") == ""
+    _, kwargs = mock_run.call_args
+    assert kwargs["stdin"] == subprocess.DEVNULL
+    assert "input" not in kwargs
@@ -1,6 +1,7 @@
 import pytest
 
 from gwf.cli import main
+from gwf.plugins.run import submission_waves
 
 
 SIMPLE_WORKFLOW = """from gwf import Workflow
@@ -44,3 +45,28 @@ def setup(simple_workflow):
 #     args, kwargs = mock_schedule_many.call_args
 #     assert len(args[0]) == 1
 #     assert {x.name for x in args[0]} == {"Target1"}
+
+
+def test_submission_waves_groups_independent_targets(diamond_graph):
+    target1, target2, target3, target4 = (
+        diamond_graph["TestTarget1"],
+        diamond_graph["TestTarget2"],
+        diamond_graph["TestTarget3"],
+        diamond_graph["TestTarget4"],
+    )
+    scheduled = {
+        target1: set(),
+        target2: {target1},
+        target3: {target1},
+        target4: {target2, target3},
+    }
+
+    waves = submission_waves([target1, target2, target3, target4], scheduled)
+    assert waves == [[target1], [target2, target3], [target4]]
+
+
+def test_submission_waves_ignores_dependencies_not_being_submitted(diamond_graph):
+    target1, target2 = diamond_graph["TestTarget1"], diamond_graph["TestTarget2"]
+    scheduled = {target1: set(), target2: {target1}}
+
+    assert submission_waves([target2], scheduled) == [[target2]]